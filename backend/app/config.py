@@ -2,6 +2,7 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     OPENAI_API_KEY: str
+    OPENAI_MODEL: str = "gpt-4o-mini"
     
     class Config:
         env_file = ".env" 
\ No newline at end of file
@@ -1,15 +1,20 @@
 from fastapi import FastAPI, WebSocket, HTTPException, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from typing import List
+from typing import Dict, Set
 import json
+import orjson
 import numpy as np
-import os
 from dotenv import load_dotenv
 import asyncio
 import logging
-import whisper
-import openai
+from app.models import get_openai_client, get_openai_model, get_whisper, warm_up
+from app.services.audio_batcher import AudioBatcher, SAMPLE_RATE
+from app.services.streaming import LocalAgreementTranscriber
+from app.services.debounce import DebouncedTask
+from app.services.transcription_service import ActionItemList
+from app.services.preprocess import AudioDecoder
+from app.services.rolling_transcript import RollingTranscript
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -19,8 +24,9 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 app = FastAPI()
-model = whisper.load_model("base")
-openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+model = get_whisper()
+batcher = AudioBatcher(model)
+openai_client = get_openai_client()
 
 # Configure CORS
 app.add_middleware(
@@ -33,18 +39,33 @@ app.add_middleware(
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
+        self.active_connections: Set[WebSocket] = set()
+        self.streams: Dict[WebSocket, LocalAgreementTranscriber] = {}
         self.shutdown_event = asyncio.Event()
-        self.current_transcript = ""
+        # Bounded prompt context: recent speech plus a summary of older text
+        self.transcript = RollingTranscript(openai_client)
+        # Coalesce LLM analysis so it runs after a pause in speech, off the audio path
+        self.analyzer = DebouncedTask(self.analyze_transcript, delay=3.0)
+        # Prompt text of the last successful analysis; unchanged text needs no new LLM calls
+        self.last_analyzed = None
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.active_connections.add(websocket)
+        self.streams[websocket] = LocalAgreementTranscriber(batcher)
         logger.info("New WebSocket connection established")
 
     async def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+            self.active_connections.discard(websocket)
+            stream = self.streams.pop(websocket, None)
+            # The last phrase never gets a second window to confirm it; keep it as heard
+            if stream is not None:
+                text = stream.finish()
+                if text:
+                    self.transcript.append(text)
+                    self.analyzer.trigger()
+                    await self.broadcast({"type": "update", "data": {"transcript": text}})
             try:
                 await websocket.close()
                 logger.info("WebSocket connection closed")
@@ -52,94 +73,140 @@ class ConnectionManager:
                 pass
 
     async def broadcast(self, message: dict):
-        disconnected = []
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting message: {str(e)}")
-                disconnected.append(connection)
+        # Binary frames skip UTF-8 validation; the client decodes them as JSON
+        payload = orjson.dumps(message)
+        connections = list(self.active_connections)
+        results = await asyncio.gather(
+            *[connection.send_bytes(payload) for connection in connections],
+            return_exceptions=True
+        )
         
-        for conn in disconnected:
-            await self.disconnect(conn)
+        for conn, result in zip(connections, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error broadcasting message: {str(result)}")
+                await self.disconnect(conn)
 
-    async def process_audio(self, audio_data: np.ndarray):
+    async def process_audio(self, websocket: WebSocket, audio_data: np.ndarray):
         try:
-            # Process audio with Whisper
-            result = model.transcribe(audio_data)
-            transcribed_text = result["text"]
-            self.current_transcript += transcribed_text
+            # Process audio with Whisper, emitting only words confirmed by two windows
+            transcribed_text = await self.streams[websocket].process(audio_data)
+            self.transcript.append(transcribed_text)
+            if transcribed_text:
+                self.analyzer.trigger()
 
-            # Generate diagram using OpenAI
-            diagram = await self.generate_diagram(self.current_transcript)
-
-            # Extract action items
-            action_items = await self.extract_action_items(self.current_transcript)
+            return {"transcript": transcribed_text}
+        except Exception as e:
+            logger.error(f"Error processing audio: {str(e)}")
+            return {"error": str(e)}
 
-            return {
-                "transcript": transcribed_text,
+    async def analyze_transcript(self):
+        # Generate diagram and extract action items concurrently
+        transcript = self.transcript.text()
+        if transcript == self.last_analyzed:
+            return
+        diagram, action_items = await asyncio.gather(
+            self.generate_diagram(transcript),
+            self.extract_action_items(transcript),
+        )
+        if diagram is not None:
+            self.last_analyzed = transcript
+
+        await self.broadcast({
+            "type": "update",
+            "data": {
                 "diagram": diagram,
                 "action_items": action_items
             }
-        except Exception as e:
-            logger.error(f"Error processing audio: {str(e)}")
-            return {"error": str(e)}
+        })
 
     async def generate_diagram(self, text: str):
         try:
             response = await openai_client.chat.completions.create(
-                model="gpt-4",
+                model=get_openai_model(),
                 messages=[
                     {"role": "system", "content": "Generate a Mermaid diagram based on the conversation. Focus on key concepts and relationships."},
                     {"role": "user", "content": text}
-                ]
+                ],
+                stream=True
             )
-            return response.choices[0].message.content
+            # Push tokens to clients as they arrive; the full diagram follows in the update
+            parts = []
+            async for chunk in response:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    await self.broadcast({"type": "diagram_delta", "data": delta})
+            return "".join(parts)
         except Exception as e:
             logger.error(f"Error generating diagram: {str(e)}")
             return None
 
     async def extract_action_items(self, text: str):
         try:
-            response = await openai_client.chat.completions.create(
-                model="gpt-4",
+            # Structured outputs return schema-validated items in one pass
+            completion = await openai_client.beta.chat.completions.parse(
+                model=get_openai_model(),
                 messages=[
-                    {"role": "system", "content": "Extract action items from the conversation. Format as a list of tasks with assignees and due dates if mentioned."},
+                    {"role": "system", "content": "Extract action items from the conversation, with assignees and due dates if mentioned."},
                     {"role": "user", "content": text}
-                ]
+                ],
+                response_format=ActionItemList
             )
-            return response.choices[0].message.content
+            parsed = completion.choices[0].message.parsed
+            return [item.model_dump() for item in parsed.items] if parsed else []
         except Exception as e:
             logger.error(f"Error extracting action items: {str(e)}")
             return []
 
 manager = ConnectionManager()
 
+@app.on_event("startup")
+async def warm_up_models():
+    """Pay model and JIT warm-up costs before accepting audio"""
+    await asyncio.to_thread(warm_up)
+
 @app.websocket("/ws/audio")
 async def websocket_endpoint(websocket: WebSocket):
     await manager.connect(websocket)
+    shutdown_wait = None
     try:
+        # Clients may declare their capture format, e.g. /ws/audio?sample_rate=48000&encoding=pcm16
+        try:
+            decoder = AudioDecoder(
+                websocket.query_params.get("encoding", "f32"),
+                int(websocket.query_params.get("sample_rate", SAMPLE_RATE)),
+            )
+        except ValueError as e:
+            logger.warning(f"Rejecting WebSocket connection: {str(e)}")
+            return
+        # One long-lived shutdown waiter instead of a timeout per receive
+        shutdown_wait = asyncio.create_task(manager.shutdown_event.wait())
         while not manager.shutdown_event.is_set():
             try:
-                # Receive audio data with a timeout
-                data = await asyncio.wait_for(websocket.receive_bytes(), timeout=1.0)
-                logger.info(f"Received audio chunk of size: {len(data)} bytes")
+                # Receive audio data unless the server starts shutting down first
+                recv_task = asyncio.create_task(websocket.receive_bytes())
+                done, _ = await asyncio.wait(
+                    {recv_task, shutdown_wait},
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+                if recv_task not in done:
+                    recv_task.cancel()
+                    break
+                data = recv_task.result()
                 
-                # Convert bytes to numpy array
-                audio_array = np.frombuffer(data, dtype=np.float32)
-                logger.info(f"Converted to numpy array of shape: {audio_array.shape}")
+                # Zero-copy view for 16 kHz float32; JIT-compiled conversion otherwise
+                audio_array = decoder.decode(data)
                 
                 # Process audio and generate results
-                results = await manager.process_audio(audio_array)
+                results = await manager.process_audio(websocket, audio_array)
                 
-                # Broadcast results to all connected clients
-                await manager.broadcast({
-                    "type": "update",
-                    "data": results
-                })
+                # Broadcast results to all connected clients; most frames commit nothing
+                if results.get("transcript") or "error" in results:
+                    await manager.broadcast({
+                        "type": "update",
+                        "data": results
+                    })
                 
-            except asyncio.TimeoutError:
-                continue
             except WebSocketDisconnect:
                 logger.info("WebSocket disconnected")
                 await manager.disconnect(websocket)
@@ -156,6 +223,8 @@ async def websocket_endpoint(websocket: WebSocket):
         import traceback
         traceback.print_exc()
     finally:
+        if shutdown_wait is not None:
+            shutdown_wait.cancel()
         await manager.disconnect(websocket)
 
 @app.get("/api/health")
@@ -0,0 +1,66 @@
+import functools
+import os
+from typing import Optional
+
+import httpx
+import numpy as np
+import openai
+from faster_whisper import WhisperModel, BatchedInferencePipeline
+
+from app.services.mel import use_numba_features
+
+@functools.lru_cache(maxsize=1)
+def get_whisper() -> BatchedInferencePipeline:
+    """Load the Whisper pipeline once per process"""
+    # CTranslate2 int8 conversion of whisper-base (see README); falls back to the stock download
+    model_dir = os.getenv("WHISPER_MODEL_DIR", "models/whisper-base-int8")
+    model = WhisperModel(
+        model_dir if os.path.isdir(model_dir) else "base",
+        device="cuda",
+        compute_type="int8_float16",
+    )
+    # Opt-in until benchmarks/bench_mel.py shows a win on the target hardware
+    if os.getenv("WHISPER_NUMBA_FEATURES") == "1":
+        model = use_numba_features(model)
+    return BatchedInferencePipeline(model)
+
+def get_openai_client(api_key: Optional[str] = None) -> openai.AsyncOpenAI:
+    """Return a pooled HTTP/2 OpenAI client, one per API key"""
+    # Resolve the key first so the default and an explicit env key share one client
+    return _openai_client(api_key or os.getenv("OPENAI_API_KEY"))
+
+@functools.lru_cache(maxsize=None)
+def _openai_client(api_key: Optional[str]) -> openai.AsyncOpenAI:
+    return openai.AsyncOpenAI(
+        api_key=api_key,
+        http_client=httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        ),
+    )
+
+def get_openai_model() -> str:
+    """Chat model used for diagram and action-item generation"""
+    return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+def warm_up(iterations: int = 2):
+    """Run dummy passes so model initialization and JIT compilation happen before the first request"""
+    from app.services.audio_batcher import SAMPLE_RATE
+    from app.services.preprocess import AudioDecoder
+
+    # Whisper always encodes fixed 30 s windows, so one full-length clip covers the shapes we serve
+    audio = np.zeros(SAMPLE_RATE * 30, dtype=np.float32)
+    for _ in range(iterations):
+        segments, _ = get_whisper().transcribe(
+            audio,
+            batch_size=1,
+            vad_filter=False,
+            clip_timestamps=[{"start": 0, "end": audio.size}],
+            word_timestamps=True,
+        )
+        list(segments)
+
+    # Compile the Numba kernels for the common capture formats
+    frame = np.zeros(4096, dtype=np.int16).tobytes()
+    for sample_rate in (SAMPLE_RATE, 44100, 48000):
+        AudioDecoder("pcm16", sample_rate).decode(frame)
@@ -0,0 +1,107 @@
+import asyncio
+import numpy as np
+from typing import List, Optional, Tuple
+
+SAMPLE_RATE = 16000
+# Samples per Whisper frame; segment.seek counts these
+HOP_LENGTH = 160
+
+# (start seconds, end seconds, word) relative to the submitted chunk
+TimedWord = Tuple[float, float, str]
+PendingChunk = Tuple[np.ndarray, str, asyncio.Future]
+
+class AudioBatcher:
+    """Coalesce concurrent transcription requests into batched Whisper calls."""
+
+    def __init__(self, model, max_batch: int = 16, window: float = 0.1,
+                 bucket_ratio: float = 1.25):
+        self.model = model
+        self.max_batch = max_batch
+        self.window = window
+        self.bucket_ratio = bucket_ratio
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._collector: Optional[asyncio.Task] = None
+        # Reused host buffer for padded batches; buckets are transcribed one at a time
+        self._scratch = np.empty(0, dtype=np.float32)
+
+    async def submit(self, audio: np.ndarray, initial_prompt: str = "") -> List[TimedWord]:
+        """Queue an audio chunk and wait for its word-level transcription"""
+        if self._collector is None or self._collector.done():
+            self._collector = asyncio.create_task(self.batch_collector())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((audio, initial_prompt, future))
+        return await future
+
+    async def batch_collector(self):
+        """Gather chunks arriving within the batching window and transcribe them together"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[PendingChunk] = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            for bucket in self._bucket(batch):
+                try:
+                    results = await asyncio.to_thread(self._transcribe, bucket)
+                except Exception as e:
+                    for _, _, future in bucket:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, _, future), words in zip(bucket, results):
+                    if not future.done():
+                        future.set_result(words)
+
+    def _bucket(self, batch: List[PendingChunk]) -> List[List[PendingChunk]]:
+        """Group chunks sharing a prompt and of similar duration so padding stays small"""
+        buckets: List[List[PendingChunk]] = []
+        for item in sorted(batch, key=lambda pending: (pending[1], pending[0].size)):
+            first = buckets[-1][0] if buckets else None
+            if (first is not None and item[1] == first[1]
+                    and item[0].size <= first[0].size * self.bucket_ratio):
+                buckets[-1].append(item)
+            else:
+                buckets.append([item])
+        return buckets
+
+    def _transcribe(self, bucket: List[PendingChunk]) -> List[List[TimedWord]]:
+        """Run one batched Whisper call over a bucket, padding each chunk to the longest"""
+        length = max(max(audio.size for audio, _, _ in bucket), 1)
+        total = length * len(bucket)
+        if self._scratch.size < total:
+            self._scratch = np.empty(total, dtype=np.float32)
+        padded = self._scratch[:total]
+        for i, (audio, _, _) in enumerate(bucket):
+            padded[i * length:i * length + audio.size] = audio
+            padded[i * length + audio.size:(i + 1) * length] = 0.0
+
+        # One clip per chunk (in samples): the pipeline encodes every clip in a single batch
+        clips = [{"start": i * length, "end": (i + 1) * length} for i in range(len(bucket))]
+        segments, _ = self.model.transcribe(
+            padded,
+            batch_size=len(bucket),
+            vad_filter=False,
+            clip_timestamps=clips,
+            initial_prompt=bucket[0][1] or None,
+            word_timestamps=True,
+        )
+
+        # segment.seek is the clip start in frames; segment.start is rounded and can
+        # land in the previous clip, so map segments back to requests by seek
+        span = length / SAMPLE_RATE
+        results: List[List[TimedWord]] = [[] for _ in bucket]
+        for segment in segments:
+            index = min(round(segment.seek * HOP_LENGTH / length), len(bucket) - 1)
+            offset = index * span
+            results[index].extend(
+                (word.start - offset, word.end - offset, word.word)
+                for word in segment.words or []
+            )
+        return results
@@ -0,0 +1,60 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class DebouncedTask:
+    """Run an async callback once input has been quiet for `delay` seconds.
+
+    Each trigger restarts the wait, but never past `max_wait` from the first
+    unhandled trigger, and never interrupts a run already in progress;
+    triggers that arrive during a run schedule a single follow-up run.
+    """
+
+    def __init__(self, callback: Callable[[], Awaitable[None]],
+                 delay: float = 3.0, max_wait: float = 10.0):
+        self.callback = callback
+        self.delay = delay
+        self.max_wait = max_wait
+        self._pending: Optional[asyncio.Task] = None
+        self._deadline: Optional[float] = None
+        self._running = False
+        self._rerun = False
+
+    def trigger(self):
+        """Note new input and (re)start the debounce timer"""
+        if self._pending and not self._pending.done():
+            if self._running:
+                self._rerun = True
+                return
+            self._pending.cancel()
+
+        loop = asyncio.get_running_loop()
+        if self._deadline is None:
+            self._deadline = loop.time() + self.max_wait
+        delay = min(self.delay, max(self._deadline - loop.time(), 0.0))
+        self._pending = asyncio.create_task(self._run(delay))
+
+    def cancel(self):
+        """Drop any scheduled or running callback"""
+        if self._pending and not self._pending.done():
+            self._pending.cancel()
+        self._pending = None
+        self._deadline = None
+        self._rerun = False
+
+    async def _run(self, delay: float):
+        await asyncio.sleep(delay)
+        self._deadline = None
+        self._running = True
+        try:
+            await self.callback()
+        except Exception as e:
+            logger.error(f"Error in debounced task: {str(e)}")
+        finally:
+            self._running = False
+            self._pending = None
+            if self._rerun:
+                self._rerun = False
+                self.trigger()
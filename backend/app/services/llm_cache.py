@@ -0,0 +1,103 @@
+import asyncio
+import functools
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+logger = logging.getLogger(__name__)
+
+@functools.lru_cache(maxsize=1)
+def get_embedder():
+    """Load the sentence-transformers model on first use"""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+def embed(text: str) -> np.ndarray:
+    return get_embedder().encode(text, normalize_embeddings=True).astype(np.float32)
+
+class LLMCache:
+    """Two-tier cache for LLM responses: exact prompt hash, then embedding similarity."""
+
+    def __init__(self, maxsize: int = 256, threshold: float = 0.95):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.exact: OrderedDict[str, Any] = OrderedDict()
+        # (embedding, response, timestamp), oldest first
+        self.entries: List[Tuple[np.ndarray, Any, float]] = []
+
+    @staticmethod
+    def key(prompt: str) -> str:
+        return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+    def get_exact(self, prompt: str) -> Optional[Any]:
+        key = self.key(prompt)
+        if key in self.exact:
+            self.exact.move_to_end(key)
+            return self.exact[key]
+        return None
+
+    def get_similar(self, embedding: np.ndarray) -> Optional[Any]:
+        if not self.entries:
+            return None
+        # Embeddings are normalized, so the dot product is the cosine similarity
+        matrix = np.stack([entry[0] for entry in self.entries])
+        scores = matrix @ embedding
+        best = int(np.argmax(scores))
+        if scores[best] > self.threshold:
+            return self.entries[best][1]
+        return None
+
+    def insert(self, prompt: str, embedding: Optional[np.ndarray], response: Any):
+        self.exact[self.key(prompt)] = response
+        if len(self.exact) > self.maxsize:
+            self.exact.popitem(last=False)
+        if embedding is None:
+            return
+        self.entries.append((embedding, response, time.time()))
+        if len(self.entries) > self.maxsize:
+            self.entries.pop(0)
+
+def llm_cache(maxsize: int = 256, threshold: float = 0.95, semantic: bool = True):
+    """Cache an async `method(self, text)` LLM call by exact and semantic prompt match.
+
+    The embedding model only sees the first 256 word pieces of a prompt, so
+    pass semantic=False for prompts that grow by appending (e.g. a running
+    transcript): their embeddings stop changing and stale responses would
+    keep matching. Cache failures always fall through to the real call.
+    The semantic tier needs requirements-semantic-cache.txt installed.
+    """
+    def decorator(func):
+        cache = LLMCache(maxsize=maxsize, threshold=threshold)
+
+        @functools.wraps(func)
+        async def wrapper(self, text: str):
+            cached = cache.get_exact(text)
+            if cached is not None:
+                return cached
+
+            embedding = None
+            if semantic:
+                try:
+                    embedding = await asyncio.to_thread(embed, text)
+                    cached = cache.get_similar(embedding)
+                except Exception as e:
+                    logger.error(f"Error looking up semantic cache: {str(e)}")
+                    embedding, cached = None, None
+                if cached is not None:
+                    return cached
+
+            response = await func(self, text)
+            # Failed calls return None/[]; don't pin those in the cache
+            if response:
+                cache.insert(text, embedding, response)
+            return response
+
+        wrapper.cache = cache
+        return wrapper
+    return decorator
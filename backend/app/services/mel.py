@@ -0,0 +1,74 @@
+import math
+import numba
+import numpy as np
+from faster_whisper import WhisperModel
+from faster_whisper.feature_extractor import FeatureExtractor
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def power_spectrum(spectrum: np.ndarray) -> np.ndarray:
+    """|X|^2 of an rfft spectrum, without the sqrt/square round trip of np.abs(x) ** 2"""
+    n_frames, n_bins = spectrum.shape
+    out = np.empty((n_frames, n_bins), dtype=np.float32)
+    for t in numba.prange(n_frames):
+        for k in range(n_bins):
+            value = spectrum[t, k]
+            out[t, k] = value.real * value.real + value.imag * value.imag
+    return out
+
+@numba.njit(parallel=True, fastmath=True, cache=True)
+def normalize_log_mel(mel: np.ndarray) -> np.ndarray:
+    """Whisper's log10, 8 dB dynamic-range clamp and rescale, fused into two passes"""
+    n_mels, n_frames = mel.shape
+    out = np.empty((n_mels, n_frames), dtype=np.float32)
+    for m in numba.prange(n_mels):
+        for t in range(n_frames):
+            out[m, t] = math.log10(max(mel[m, t], 1e-10))
+
+    floor = out.max() - 8.0
+    for m in numba.prange(n_mels):
+        for t in range(n_frames):
+            out[m, t] = (max(out[m, t], floor) + 4.0) / 4.0
+    return out
+
+class NumbaFeatureExtractor(FeatureExtractor):
+    """Drop-in FeatureExtractor with a cached window and JIT-compiled elementwise steps.
+
+    The mel projection stays a BLAS matmul; only the power spectrum and the
+    log/clamp/rescale are compiled. See benchmarks/bench_mel.py.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.window = np.hanning(self.n_fft + 1)[:-1].astype(np.float32)
+        self.filters = np.ascontiguousarray(self.mel_filters, dtype=np.float32)
+
+    def __call__(self, waveform: np.ndarray, padding=160, chunk_length=None):
+        if chunk_length is not None:
+            self.n_samples = chunk_length * self.sampling_rate
+            self.nb_max_frames = self.n_samples // self.hop_length
+
+        waveform = np.asarray(waveform, dtype=np.float32)
+        if padding:
+            waveform = np.pad(waveform, (0, padding))
+
+        # Centered STFT with reflect padding, matching Whisper's reference frontend
+        half = self.n_fft // 2
+        waveform = np.pad(waveform, (half, half), mode="reflect")
+        frames = np.lib.stride_tricks.sliding_window_view(waveform, self.n_fft)[::self.hop_length]
+        spectrum = np.fft.rfft(frames * self.window, axis=-1).astype(np.complex64)
+
+        # Whisper drops the final STFT frame
+        power = power_spectrum(spectrum[:-1])
+        return normalize_log_mel(self.filters @ power.T)
+
+def use_numba_features(model: WhisperModel) -> WhisperModel:
+    """Swap a loaded model's feature extractor for the Numba implementation"""
+    current = model.feature_extractor
+    model.feature_extractor = NumbaFeatureExtractor(
+        feature_size=current.mel_filters.shape[0],
+        sampling_rate=current.sampling_rate,
+        hop_length=current.hop_length,
+        chunk_length=current.n_samples // current.sampling_rate,
+        n_fft=current.n_fft,
+    )
+    return model
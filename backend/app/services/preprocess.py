@@ -0,0 +1,98 @@
+import functools
+import math
+import numba
+import numpy as np
+from typing import Tuple
+
+from app.services.audio_batcher import SAMPLE_RATE
+
+# Capture rates we resample from; the filter grows with the rate ratio, so arbitrary rates are refused
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 22050, 24000, 32000, 44100, 48000, 96000)
+
+@numba.njit(cache=True, fastmath=True)
+def pcm16_to_f32(buf: np.ndarray) -> np.ndarray:
+    """Convert int16 PCM samples to float32 in [-1, 1)"""
+    out = np.empty(buf.size, dtype=np.float32)
+    for i in range(buf.size):
+        out[i] = buf[i] * np.float32(1.0 / 32768.0)
+    return out
+
+@numba.njit(cache=True, fastmath=True)
+def polyphase_resample(history: np.ndarray, taps: np.ndarray, up: int, down: int,
+                       history_start: int, n_start: int, n_stop: int) -> np.ndarray:
+    """Outputs n_start..n_stop-1 of an up/down linear-phase FIR resampling of a stream.
+
+    history[0] is input sample `history_start`; samples before the stream start count as zero.
+    """
+    n_taps = taps.size
+    delay = (n_taps - 1) // 2
+    out = np.empty(n_stop - n_start, dtype=np.float32)
+    for i in range(n_stop - n_start):
+        # Position in the zero-stuffed signal, shifted to undo the filter delay
+        t = (n_start + i) * down + delay
+        first = max(history_start, (t - n_taps + up) // up)
+        last = min(history_start + history.size - 1, t // up)
+        acc = 0.0
+        for j in range(first, last + 1):
+            acc += taps[t - j * up] * history[j - history_start]
+        out[i] = acc
+    return out
+
+@functools.lru_cache(maxsize=8)
+def resample_filter(sample_rate: int, zero_crossings: int = 16) -> Tuple[np.ndarray, int, int]:
+    """Windowed-sinc anti-aliasing filter and up/down factors for sample_rate -> 16 kHz"""
+    g = math.gcd(sample_rate, SAMPLE_RATE)
+    up, down = SAMPLE_RATE // g, sample_rate // g
+    factor = max(up, down)
+    cutoff = 0.95 / factor
+    k = np.arange(2 * zero_crossings * factor + 1) - zero_crossings * factor
+    taps = up * cutoff * np.sinc(cutoff * k) * np.hanning(k.size)
+    return taps.astype(np.float32), up, down
+
+class StreamResampler:
+    """Resample a stream to 16 kHz frame by frame, carrying input history and phase across frames."""
+
+    def __init__(self, sample_rate: int):
+        self.taps, self.up, self.down = resample_filter(sample_rate)
+        self.delay = (self.taps.size - 1) // 2
+        self.history = np.zeros(0, dtype=np.float32)
+        self.history_start = 0
+        self.n_out = 0
+
+    def process(self, audio: np.ndarray) -> np.ndarray:
+        """Return every output sample whose inputs have now all arrived"""
+        self.history = np.concatenate([self.history, audio])
+        n_in = self.history_start + self.history.size
+        # Output n needs input samples up to (n * down + delay) // up
+        n_stop = max(self.n_out, (n_in * self.up - 1 - self.delay) // self.down + 1)
+        out = polyphase_resample(self.history, self.taps, self.up, self.down,
+                                 self.history_start, self.n_out, n_stop)
+        self.n_out = n_stop
+
+        # Drop input that no future output reaches
+        t = n_stop * self.down + self.delay
+        keep = min(max(self.history_start, (t - self.taps.size + self.up) // self.up), n_in)
+        self.history = self.history[keep - self.history_start:]
+        self.history_start = keep
+        return out
+
+class AudioDecoder:
+    """Per-connection decoder from raw websocket frames to 16 kHz float32 samples."""
+
+    def __init__(self, encoding: str = "f32", sample_rate: int = SAMPLE_RATE):
+        if encoding not in ("f32", "pcm16"):
+            raise ValueError(f"Unsupported audio encoding: {encoding}")
+        if sample_rate not in SUPPORTED_SAMPLE_RATES:
+            raise ValueError(f"Unsupported sample rate: {sample_rate}")
+        self.encoding = encoding
+        self.resampler = StreamResampler(sample_rate) if sample_rate != SAMPLE_RATE else None
+
+    def decode(self, data: bytes) -> np.ndarray:
+        if self.encoding == "pcm16":
+            audio = pcm16_to_f32(np.frombuffer(data, dtype=np.int16))
+        else:
+            audio = np.frombuffer(data, dtype=np.float32)
+
+        if self.resampler is not None:
+            audio = self.resampler.process(audio)
+        return audio
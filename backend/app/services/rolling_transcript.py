@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+import openai
+import tiktoken
+
+from app.models import get_openai_model
+
+logger = logging.getLogger(__name__)
+
+# Consecutive failed summaries before unsummarized text is dropped from the prompt
+MAX_SUMMARY_FAILURES = 3
+
+class RollingTranscript:
+    """Recent transcript text within a token budget, plus a running summary of older text.
+
+    Text pushed out of the window is folded into the summary in the background
+    every few appends, so prompts stay bounded however long the meeting runs.
+    """
+
+    def __init__(self, client: openai.AsyncOpenAI, max_tokens: int = 2000,
+                 summarize_every: int = 20):
+        self.client = client
+        self.max_tokens = max_tokens
+        self.summarize_every = summarize_every
+        self.encoding = tiktoken.encoding_for_model("gpt-4")
+        # (text, token count), oldest first
+        self.recent: Deque[Tuple[str, int]] = deque()
+        self.recent_tokens = 0
+        self.summary = ""
+        self.evicted = ""
+        self._appends = 0
+        self._failures = 0
+        self._summarizing: Optional[asyncio.Task] = None
+
+    def append(self, text: str):
+        """Add new transcript text, evicting the oldest text beyond the token budget"""
+        if not text:
+            return
+        tokens = len(self.encoding.encode(text))
+        self.recent.append((text, tokens))
+        self.recent_tokens += tokens
+        while self.recent_tokens > self.max_tokens and len(self.recent) > 1:
+            old_text, old_tokens = self.recent.popleft()
+            self.recent_tokens -= old_tokens
+            self.evicted += old_text
+
+        self._appends += 1
+        if (self._appends % self.summarize_every == 0 and self.evicted
+                and (self._summarizing is None or self._summarizing.done())):
+            self._summarizing = asyncio.create_task(self._summarize())
+
+    def text(self) -> str:
+        """Prompt text: summary so far, anything not yet summarized, then recent speech"""
+        recent = "".join(text for text, _ in self.recent)
+        if not self.summary and not self.evicted:
+            return recent
+        return f"Summary of the meeting so far: {self.summary}\n\nRecent transcript: {self.evicted}{recent}"
+
+    async def _summarize(self):
+        evicted = self.evicted
+        try:
+            response = await self.client.chat.completions.create(
+                model=get_openai_model(),
+                messages=[
+                    {"role": "system", "content": "Update the running meeting summary with the new transcript text. Keep decisions, owners and open questions. Reply with the updated summary only."},
+                    {"role": "user", "content": f"Current summary: {self.summary}\n\nNew transcript text: {evicted}"}
+                ]
+            )
+            self.summary = response.choices[0].message.content or self.summary
+            # Text evicted while we were summarizing stays for the next round
+            self.evicted = self.evicted[len(evicted):]
+            self._failures = 0
+        except Exception as e:
+            logger.error(f"Error summarizing transcript: {str(e)}")
+            # Don't let the prompt grow without bound while summaries keep failing
+            self._failures += 1
+            if self._failures >= MAX_SUMMARY_FAILURES:
+                logger.error(f"Dropping {len(self.evicted)} characters of unsummarized transcript "
+                             f"after {self._failures} failed summaries")
+                self.evicted = ""
+                self._failures = 0
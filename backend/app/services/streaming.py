@@ -0,0 +1,94 @@
+import asyncio
+import numpy as np
+from typing import List
+
+from app.services.audio_batcher import AudioBatcher, SAMPLE_RATE, TimedWord
+from app.services.vad import has_speech
+
+class LocalAgreementTranscriber:
+    """Per-stream rolling-window transcription using LocalAgreement-2.
+
+    Incoming frames are accumulated until at least `min_chunk` seconds of new
+    audio are available, then transcribed together with the audio that still
+    holds unconfirmed words. Words are only emitted once two successive
+    windows agree on them. Audio is only dropped once it is committed, or
+    once the buffer exceeds a hard cap, in which case the unconfirmed words
+    falling out of it are committed as they stand rather than lost.
+    """
+
+    def __init__(self, batcher: AudioBatcher, min_chunk: float = 1.0,
+                 max_tail: float = 2.0, max_buffer: float = 15.0):
+        self.batcher = batcher
+        self.min_chunk = min_chunk
+        self.max_tail = max_tail
+        self.max_buffer = max_buffer
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.audio_start = 0.0
+        self.unprocessed = 0
+        self.committed_until = 0.0
+        self.prefix = ""
+        self.pending: List[TimedWord] = []
+
+    async def process(self, chunk: np.ndarray) -> str:
+        """Add a frame of audio and return any newly committed text"""
+        self.audio = np.concatenate([self.audio, chunk])
+        self.unprocessed += chunk.size
+        # Windows only a frame apart would trivially agree, even on a cut-off word
+        if self.unprocessed < self.min_chunk * SAMPLE_RATE:
+            return ""
+        new_audio = self.unprocessed / SAMPLE_RATE
+        self.unprocessed = 0
+
+        committed: List[TimedWord] = []
+        # Skip Whisper entirely when the window holds no speech
+        if await asyncio.to_thread(has_speech, self.audio):
+            words = await self.batcher.submit(self.audio, initial_prompt=self.prefix)
+            hypothesis = [
+                (self.audio_start + start, self.audio_start + end, word)
+                for start, end, word in words
+            ]
+
+            for previous, current in zip(self.pending, hypothesis):
+                if _normalize(previous[2]) != _normalize(current[2]):
+                    break
+                committed.append(current)
+            self.pending = hypothesis[len(committed):]
+
+        audio_end = self.audio_start + self.audio.size / SAMPLE_RATE
+        keep_from = committed[-1][1] if committed else self.committed_until
+        if not self.pending:
+            # Nothing unconfirmed: keep a short tail in case a word is just starting
+            keep_from = max(keep_from, audio_end - self.max_tail)
+
+        # Hard cap, always larger than the audio added in this pass
+        cap = max(self.max_buffer, new_audio + self.max_tail)
+        if audio_end - keep_from > cap:
+            keep_from = audio_end - cap
+            forced = [word for word in self.pending if word[0] < keep_from]
+            if forced:
+                committed.extend(forced)
+                self.pending = self.pending[len(forced):]
+                keep_from = max(keep_from, forced[-1][1])
+
+        if committed:
+            self.committed_until = committed[-1][1]
+            # Carry only the last committed word over as the next prompt
+            self.prefix = committed[-1][2].strip()
+
+        keep_from = max(keep_from, self.audio_start)
+        offset = min(int((keep_from - self.audio_start) * SAMPLE_RATE), self.audio.size)
+        self.audio = self.audio[offset:]
+        self.audio_start += offset / SAMPLE_RATE
+
+        return "".join(word for _, _, word in committed)
+
+    def finish(self) -> str:
+        """End the stream, returning the still unconfirmed words as committed text"""
+        text = "".join(word for _, _, word in self.pending)
+        self.pending = []
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.unprocessed = 0
+        return text
+
+def _normalize(word: str) -> str:
+    return word.strip().strip(".,!?;:").lower()
@@ -1,15 +1,19 @@
-import whisper
+from app.models import get_openai_client, get_openai_model, get_whisper
 import numpy as np
-from typing import Dict, List, Optional, Callable
+from typing import Dict, List, Optional, Callable, Set
 from datetime import datetime
-import openai
 from pydantic import BaseModel
 import asyncio
 from fastapi import WebSocket
 import json
-from queue import Queue
-import threading
-import time
+import orjson
+import jsonpatch
+from app.services.debounce import DebouncedTask
+from app.services.audio_batcher import AudioBatcher, SAMPLE_RATE
+from app.services.vad import speech_only
+
+# Consecutive failed patch requests before the unsent transcript delta is dropped
+MAX_PATCH_FAILURES = 3
 
 class ActionItem(BaseModel):
     task: str
@@ -19,6 +23,16 @@ class ActionItem(BaseModel):
     status: str = "pending"
     created_at: datetime = datetime.now()
 
+class ExtractedActionItem(BaseModel):
+    task: str
+    assignee: Optional[str]
+    due_date: Optional[str]
+    context: Optional[str]
+
+class ActionItemList(BaseModel):
+    """Structured-output schema for action item extraction"""
+    items: List[ExtractedActionItem]
+
 class DiagramMetadata(BaseModel):
     diagram_type: str
     content: str
@@ -29,151 +43,223 @@ class DiagramMetadata(BaseModel):
 
 class TranscriptionService:
     def __init__(self, openai_api_key: str):
-        self.model = whisper.load_model("base")
-        self.openai_client = openai.OpenAI(api_key=openai_api_key)
+        self.model = get_whisper()
+        self.openai_client = get_openai_client(openai_api_key)
         self.current_transcript = ""
         self.action_items: List[ActionItem] = []
         self.diagrams: List[DiagramMetadata] = []
-        self.websocket_clients: List[WebSocket] = []
-        self.audio_buffer = Queue()
-        self.processing_thread = None
-        self.is_processing = False
-        
-        # Initialize background processing
-        self.start_background_processing()
+        # Structured state the LLM patches, and transcript text it hasn't seen yet
+        self.diagram_state: Dict = {"diagram_type": "flowchart", "content": "", "relationships": [], "title": None}
+        self.action_state: Dict = {"items": []}
+        self.diagram_delta = ""
+        self.action_delta = ""
+        self.diagram_failures = 0
+        self.action_failures = 0
+        self.websocket_clients: Set[WebSocket] = set()
+        self.analyzer = DebouncedTask(self._analyze_content, delay=3.0)
+        self.batcher = AudioBatcher(self.model)
+        self.audio_buffer: asyncio.Queue = asyncio.Queue()
+        # Preallocated accumulation buffer for drained chunks (up to 60 s of audio)
+        self._ring = np.empty(SAMPLE_RATE * 60, dtype=np.float32)
+        self._write_ptr = 0
+        self.processing_task: Optional[asyncio.Task] = None
 
     def start_background_processing(self):
-        """Start background thread for audio processing"""
-        self.is_processing = True
-        self.processing_thread = threading.Thread(target=self._process_audio_buffer)
-        self.processing_thread.start()
+        """Start the audio processing task; call from a running event loop (e.g. app startup)"""
+        if self.processing_task is None or self.processing_task.done():
+            self.processing_task = asyncio.create_task(self._processor())
 
-    def stop_background_processing(self):
+    async def stop_background_processing(self):
         """Stop background processing"""
-        self.is_processing = False
-        if self.processing_thread:
-            self.processing_thread.join()
+        if self.processing_task:
+            self.processing_task.cancel()
+            try:
+                await self.processing_task
+            except asyncio.CancelledError:
+                pass
+            self.processing_task = None
+        self.analyzer.cancel()
 
-    def _process_audio_buffer(self):
+    async def _processor(self):
         """Process audio chunks from buffer"""
-        while self.is_processing:
-            if not self.audio_buffer.empty():
-                chunks = []
-                # Collect all available chunks
-                while not self.audio_buffer.empty():
-                    chunks.append(self.audio_buffer.get())
-                
-                # Combine chunks and process
-                combined_audio = np.concatenate(chunks)
-                asyncio.run(self.process_audio_chunk(combined_audio))
+        while True:
+            self._append(await self.audio_buffer.get())
+            # Collect everything else that queued up meanwhile
+            while not self.audio_buffer.empty():
+                self._append(self.audio_buffer.get_nowait())
             
-            time.sleep(0.1)  # Prevent CPU overload
+            # Process a view of the combined audio; it is fully consumed before the buffer is reused
+            try:
+                await self.process_audio_chunk(self._ring[:self._write_ptr])
+            except Exception as e:
+                print(f"Error processing audio: {str(e)}")
+            finally:
+                self._write_ptr = 0
+
+    def _append(self, chunk: np.ndarray):
+        """Copy a chunk into the accumulation buffer, growing it if needed"""
+        end = self._write_ptr + chunk.size
+        if end > self._ring.size:
+            grown = np.empty(max(end, self._ring.size * 2), dtype=np.float32)
+            grown[:self._write_ptr] = self._ring[:self._write_ptr]
+            self._ring = grown
+        self._ring[self._write_ptr:end] = chunk
+        self._write_ptr = end
 
     async def register_client(self, websocket: WebSocket):
         """Register a new WebSocket client"""
         await websocket.accept()
-        self.websocket_clients.append(websocket)
+        self.websocket_clients.add(websocket)
         # Send current state to new client
-        await websocket.send_json(self.get_current_state())
+        await websocket.send_bytes(orjson.dumps(self.get_current_state()))
 
     async def remove_client(self, websocket: WebSocket):
         """Remove a WebSocket client"""
-        self.websocket_clients.remove(websocket)
+        self.websocket_clients.discard(websocket)
 
     async def broadcast_update(self, update_type: str, data: dict):
         """Broadcast updates to all connected clients"""
-        message = json.dumps({"type": update_type, "data": data})
-        for client in self.websocket_clients:
-            try:
-                await client.send_text(message)
-            except Exception:
+        message = orjson.dumps({"type": update_type, "data": data})
+        clients = list(self.websocket_clients)
+        results = await asyncio.gather(
+            *[client.send_bytes(message) for client in clients],
+            return_exceptions=True
+        )
+        for client, result in zip(clients, results):
+            if isinstance(result, Exception):
                 await self.remove_client(client)
 
     async def process_audio_chunk(self, audio_chunk: np.ndarray) -> str:
         """Process incoming audio chunks and return transcribed text"""
-        result = self.model.transcribe(audio_chunk)
-        transcribed_text = result["text"]
+        # Only feed speech to Whisper; silent chunks never reach the model
+        speech = await asyncio.to_thread(speech_only, audio_chunk)
+        if speech.size == 0:
+            return ""
+        words = await self.batcher.submit(speech)
+        transcribed_text = "".join(word for _, _, word in words)
         self.current_transcript += transcribed_text
+        self.diagram_delta += transcribed_text
+        self.action_delta += transcribed_text
         
         # Broadcast transcript update
         await self.broadcast_update("transcript", {"text": transcribed_text})
         
-        # Process the updated transcript for new insights
-        await self._analyze_content()
+        # Analyze new insights once speech pauses, without holding up transcription
+        if transcribed_text:
+            self.analyzer.trigger()
         return transcribed_text
 
     async def _analyze_content(self):
-        """Analyze transcript content for diagrams and action items"""
+        """Analyze new transcript text for diagram and action item updates"""
+        diagram_delta = self.diagram_delta
+        action_delta = self.action_delta
+
         # Process in parallel
-        diagram_task = asyncio.create_task(self._generate_diagram_spec())
-        action_items_task = asyncio.create_task(self._extract_action_items())
+        diagram_task = asyncio.create_task(self._generate_diagram_spec(diagram_delta))
+        action_items_task = asyncio.create_task(self._extract_action_items(action_delta))
         
         # Wait for both tasks to complete
         diagram, action_items = await asyncio.gather(diagram_task, action_items_task)
         
-        if diagram:
-            self.diagrams.append(diagram)
-            await self.broadcast_update("diagram", diagram.dict())
+        if diagram is None:
+            # Don't let a delta that keeps failing grow without bound
+            if diagram_delta.strip():
+                self.diagram_failures += 1
+                if self.diagram_failures >= MAX_PATCH_FAILURES:
+                    print(f"Dropping diagram delta after {self.diagram_failures} failed updates")
+                    self.diagram_delta = self.diagram_delta[len(diagram_delta):]
+                    self.diagram_failures = 0
+        else:
+            # Only drop the text that was actually sent; more may have arrived meanwhile
+            self.diagram_delta = self.diagram_delta[len(diagram_delta):]
+            self.diagram_failures = 0
+            if diagram.content and (not self.diagrams or diagram.content != self.diagrams[-1].content):
+                self.diagrams.append(diagram)
+                await self.broadcast_update("diagram", diagram.dict())
         
-        if action_items:
-            self.action_items.extend(action_items)
+        if action_items is None:
+            if action_delta.strip():
+                self.action_failures += 1
+                if self.action_failures >= MAX_PATCH_FAILURES:
+                    print(f"Dropping action item delta after {self.action_failures} failed updates")
+                    self.action_delta = self.action_delta[len(action_delta):]
+                    self.action_failures = 0
+        else:
+            self.action_delta = self.action_delta[len(action_delta):]
+            self.action_failures = 0
+            self.action_items = action_items
             await self.broadcast_update("action_items", 
                                      [item.dict() for item in action_items])
 
-    async def _generate_diagram_spec(self) -> Optional[DiagramMetadata]:
-        """Generate diagram specifications using OpenAI."""
+    async def _request_patch(self, instructions: str, state: Dict, delta: str) -> jsonpatch.JsonPatch:
+        """Ask the model for a JSON patch that folds new transcript text into the current state"""
+        response = await self.openai_client.chat.completions.create(
+            model=get_openai_model(),
+            messages=[
+                {"role": "system", "content": instructions + """
+                 Here is the current state JSON and the new transcript text.
+                 Return a JSON object {"patch": [...]} where "patch" is a JSON patch
+                 (RFC 6902 array of operations) against the state JSON that incorporates
+                 the new text. Use an empty array if nothing changes.
+                 """},
+                {"role": "user", "content": f"Current state JSON: {json.dumps(state)}\n\nNew transcript text: {delta}"}
+            ],
+            response_format={"type": "json_object"}
+        )
+        return jsonpatch.JsonPatch(json.loads(response.choices[0].message.content)["patch"])
+
+    async def _generate_diagram_spec(self, delta: str) -> Optional[DiagramMetadata]:
+        """Update the diagram specification from new transcript text using OpenAI."""
+        if not delta.strip():
+            return None
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": """
-                     Analyze the conversation and generate a Mermaid diagram specification.
-                     Identify key concepts, processes, and relationships.
-                     Output should be in the format:
-                     {
-                         "diagram_type": "flowchart|mindmap|sequence",
-                         "content": "mermaid_specification",
-                         "relationships": [{"from": "entity1", "to": "entity2", "type": "relationship_type"}]
-                     }
-                     """},
-                    {"role": "user", "content": self.current_transcript}
-                ]
-            )
+            patch = await self._request_patch("""
+                 Maintain a Mermaid diagram specification of the conversation.
+                 Identify key concepts, processes, and relationships.
+                 The state has the format:
+                 {
+                     "diagram_type": "flowchart|mindmap|sequence",
+                     "content": "mermaid_specification",
+                     "relationships": [{"from": "entity1", "to": "entity2", "type": "relationship_type"}],
+                     "title": "optional title"
+                 }
+                 """, self.diagram_state, delta)
             
-            diagram_spec = response.choices[0].message.content
-            # Parse and validate diagram specification
-            # Add to diagrams list if valid
-            return DiagramMetadata.model_validate_json(diagram_spec)
+            # Parse and validate the patched specification before committing it
+            state = patch.apply(self.diagram_state)
+            diagram = DiagramMetadata.model_validate(state)
+            self.diagram_state = state
+            return diagram
         except Exception as e:
             print(f"Error generating diagram: {str(e)}")
             return None
 
-    async def _extract_action_items(self) -> List[ActionItem]:
-        """Extract action items from the transcript."""
+    async def _extract_action_items(self, delta: str) -> Optional[List[ActionItem]]:
+        """Update the action item list from new transcript text."""
+        if not delta.strip():
+            return None
         try:
-            response = await self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": """
-                     Extract action items from the conversation.
-                     For each action item, identify:
-                     - Task description
-                     - Assignee (if mentioned)
-                     - Due date (if mentioned)
-                     - Related context
-                     """},
-                    {"role": "user", "content": self.current_transcript}
-                ]
-            )
+            patch = await self._request_patch("""
+                 Maintain the list of action items from the conversation.
+                 The state has the format {"items": [...]} where each item has:
+                 - "task": task description
+                 - "assignee": assignee (if mentioned, else null)
+                 - "due_date": ISO due date (if mentioned, else null)
+                 - "context": related context
+                 """, self.action_state, delta)
             
-            action_items_raw = response.choices[0].message.content
-            # Parse and validate action items
-            # Convert to ActionItem objects
-            return [ActionItem.model_validate_json(item) for item in action_items_raw.split('\n') if item.strip()]
+            # Parse and validate the patched items before committing them
+            state = patch.apply(self.action_state)
+            items = [
+                ActionItem.model_validate({"assignee": None, "due_date": None, "context": None, **item})
+                for item in state["items"]
+            ]
+            self.action_state = state
+            return items
             
         except Exception as e:
             print(f"Error extracting action items: {str(e)}")
-            return []
+            return None
 
     def get_current_state(self) -> Dict:
         """Return the current state of transcription, diagrams, and action items."""
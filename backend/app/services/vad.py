@@ -0,0 +1,18 @@
+import numpy as np
+from faster_whisper.vad import get_speech_timestamps
+
+def speech_only(audio: np.ndarray) -> np.ndarray:
+    """Return the speech segments of `audio` concatenated; empty if there is no speech.
+
+    Uses the Silero VAD model bundled with faster-whisper (ONNX, CPU).
+    """
+    speech = get_speech_timestamps(audio)
+    if not speech:
+        return audio[:0]
+    if len(speech) == 1 and speech[0]["start"] == 0 and speech[0]["end"] >= audio.size:
+        return audio
+    return np.concatenate([audio[segment["start"]:segment["end"]] for segment in speech])
+
+def has_speech(audio: np.ndarray) -> bool:
+    """Whether Silero VAD finds any speech in `audio`"""
+    return bool(get_speech_timestamps(audio))
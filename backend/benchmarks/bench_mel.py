@@ -0,0 +1,28 @@
+"""Compare faster-whisper's FeatureExtractor with NumbaFeatureExtractor.
+
+Run from backend/: python -m benchmarks.bench_mel
+"""
+import timeit
+
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from app.services.audio_batcher import SAMPLE_RATE
+from app.services.mel import NumbaFeatureExtractor
+
+def main(seconds: int = 30, repeat: int = 20):
+    audio = np.random.default_rng(0).uniform(-1, 1, SAMPLE_RATE * seconds).astype(np.float32)
+    reference = FeatureExtractor()
+    numba_extractor = NumbaFeatureExtractor()
+
+    # First call compiles the Numba kernels
+    expected = reference(audio)
+    actual = numba_extractor(audio)
+    print(f"max abs error: {np.abs(expected - actual).max():.2e}")
+
+    for name, extractor in (("reference", reference), ("numba", numba_extractor)):
+        best = min(timeit.repeat(lambda: extractor(audio), number=1, repeat=repeat))
+        print(f"{name:>9}: {best * 1000:.1f} ms per {seconds} s clip")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+from faster_whisper.vad import collect_chunks
+
+from app.services.audio_batcher import AudioBatcher, HOP_LENGTH, SAMPLE_RATE
+
+class FakePipeline:
+    """Stands in for BatchedInferencePipeline but slices clips with the real collect_chunks"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, batch_size, vad_filter, clip_timestamps, initial_prompt, word_timestamps):
+        audio_chunks, _ = collect_chunks(audio, clip_timestamps)
+        self.calls.append(batch_size)
+        segments = []
+        for clip, chunk in zip(clip_timestamps, audio_chunks):
+            start = clip["start"] / SAMPLE_RATE
+            word = SimpleNamespace(start=start + 0.1, end=start + 0.4, word=f" w{int(chunk[0])}")
+            # Like faster-whisper: seek is the clip start in frames, start is rounded to 3 decimals
+            segments.append(SimpleNamespace(seek=clip["start"] // HOP_LENGTH, start=round(start, 3),
+                                            text=word.word, words=[word]))
+        return iter(segments), None
+
+def test_concurrent_chunks_share_one_call_and_fan_out():
+    model = FakePipeline()
+
+    async def run():
+        batcher = AudioBatcher(model)
+        chunks = [np.full(size, value, dtype=np.float32)
+                  for value, size in ((1, 16000), (2, 17000), (3, 16500))]
+        return await asyncio.gather(*[batcher.submit(chunk) for chunk in chunks])
+
+    results = asyncio.run(run())
+
+    assert model.calls == [3]
+    assert [[word for _, _, word in words] for words in results] == [[" w1"], [" w2"], [" w3"]]
+    # Word times are relative to each submitted chunk
+    for words in results:
+        assert np.allclose(words[0][:2], (0.1, 0.4))
+
+def test_dissimilar_lengths_and_prompts_go_to_separate_calls():
+    model = FakePipeline()
+
+    async def run():
+        batcher = AudioBatcher(model)
+        return await asyncio.gather(
+            batcher.submit(np.full(16000, 1, dtype=np.float32)),
+            batcher.submit(np.full(48000, 2, dtype=np.float32)),
+            batcher.submit(np.full(16000, 3, dtype=np.float32), initial_prompt="hello"),
+        )
+
+    results = asyncio.run(run())
+
+    assert sorted(model.calls) == [1, 1, 1]
+    assert [words[0][2] for words in results] == [" w1", " w2", " w3"]
+
+def test_words_stay_with_their_chunk_when_length_is_not_frame_aligned():
+    model = FakePipeline()
+
+    async def run():
+        batcher = AudioBatcher(model)
+        chunks = [np.full(16001, value, dtype=np.float32) for value in (1, 2, 3)]
+        return await asyncio.gather(*[batcher.submit(chunk) for chunk in chunks])
+
+    results = asyncio.run(run())
+
+    assert model.calls == [3]
+    assert [[word for _, _, word in words] for words in results] == [[" w1"], [" w2"], [" w3"]]
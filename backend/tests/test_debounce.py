@@ -0,0 +1,25 @@
+import asyncio
+import logging
+
+from app.services.debounce import DebouncedTask
+
+def test_callback_errors_are_logged_and_later_triggers_still_run(caplog):
+    calls = []
+
+    async def callback():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+
+    async def run():
+        task = DebouncedTask(callback, delay=0.01)
+        task.trigger()
+        await asyncio.sleep(0.05)
+        task.trigger()
+        await asyncio.sleep(0.05)
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(run())
+
+    assert calls == [0, 1]
+    assert "boom" in caplog.text
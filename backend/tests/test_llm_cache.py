@@ -0,0 +1,65 @@
+import asyncio
+
+import numpy as np
+
+from app.services import llm_cache as llm_cache_module
+from app.services.llm_cache import llm_cache
+
+class Analyzer:
+    def __init__(self):
+        self.calls = 0
+
+    async def analyze(self, text):
+        self.calls += 1
+        return f"response {self.calls}"
+
+def wrap(**kwargs):
+    analyzer = Analyzer()
+    analyzer.analyze = llm_cache(**kwargs)(Analyzer.analyze).__get__(analyzer)
+    return analyzer
+
+def test_exact_repeat_is_served_from_cache(monkeypatch):
+    monkeypatch.setattr(llm_cache_module, "embed", lambda text: np.ones(4, dtype=np.float32) / 2)
+    analyzer = wrap()
+
+    async def run():
+        return [await analyzer.analyze("same prompt") for _ in range(3)]
+
+    assert asyncio.run(run()) == ["response 1"] * 3
+    assert analyzer.calls == 1
+
+def test_semantic_match_above_threshold(monkeypatch):
+    monkeypatch.setattr(llm_cache_module, "embed", lambda text: np.ones(4, dtype=np.float32) / 2)
+    analyzer = wrap()
+
+    async def run():
+        return [await analyzer.analyze("first"), await analyzer.analyze("second")]
+
+    assert asyncio.run(run()) == ["response 1", "response 1"]
+    assert analyzer.calls == 1
+
+def test_semantic_disabled_never_embeds(monkeypatch):
+    def fail(text):
+        raise AssertionError("embed should not be called")
+
+    monkeypatch.setattr(llm_cache_module, "embed", fail)
+    analyzer = wrap(semantic=False)
+
+    async def run():
+        return [await analyzer.analyze("first"), await analyzer.analyze("second"), await analyzer.analyze("first")]
+
+    assert asyncio.run(run()) == ["response 1", "response 2", "response 1"]
+
+def test_embedding_failure_falls_through_to_call(monkeypatch):
+    def fail(text):
+        raise OSError("model download failed")
+
+    monkeypatch.setattr(llm_cache_module, "embed", fail)
+    analyzer = wrap()
+
+    async def run():
+        return [await analyzer.analyze("first"), await analyzer.analyze("first")]
+
+    # The exact tier still works without embeddings
+    assert asyncio.run(run()) == ["response 1", "response 1"]
+    assert analyzer.calls == 1
@@ -0,0 +1,14 @@
+import numpy as np
+from faster_whisper.feature_extractor import FeatureExtractor
+
+from app.services.audio_batcher import SAMPLE_RATE
+from app.services.mel import NumbaFeatureExtractor
+
+def test_matches_reference_feature_extractor():
+    audio = np.random.default_rng(0).uniform(-1, 1, SAMPLE_RATE * 5).astype(np.float32)
+
+    expected = FeatureExtractor()(audio)
+    actual = NumbaFeatureExtractor()(audio)
+
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, atol=1e-4)
@@ -0,0 +1,7 @@
+from app.models import get_openai_client
+
+def test_default_and_explicit_env_key_share_one_client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test-shared")
+
+    assert get_openai_client() is get_openai_client("sk-test-shared")
+    assert get_openai_client("sk-test-other") is not get_openai_client()
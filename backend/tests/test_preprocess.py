@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from app.services.audio_batcher import SAMPLE_RATE
+from app.services.preprocess import AudioDecoder, StreamResampler, pcm16_to_f32
+
+def sine(rate, seconds=2.0, freq=440.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return np.sin(2 * np.pi * freq * t).astype(np.float32)
+
+@pytest.mark.parametrize("rate", [44100, 48000])
+def test_framewise_resampling_matches_whole_stream(rate):
+    audio = sine(rate)
+    whole = StreamResampler(rate).process(audio)
+
+    resampler = StreamResampler(rate)
+    framed = np.concatenate([resampler.process(audio[i:i + 2048]) for i in range(0, audio.size, 2048)])
+
+    assert framed.size == whole.size
+    np.testing.assert_allclose(framed, whole, atol=1e-5)
+
+@pytest.mark.parametrize("rate", [44100, 48000])
+def test_resampled_sine_matches_16k_sine(rate):
+    out = StreamResampler(rate).process(sine(rate))
+    expected = sine(SAMPLE_RATE)[:out.size]
+
+    # Output rate is exact, minus the filter's lookahead at the end
+    assert SAMPLE_RATE * 2 - out.size < 100
+    np.testing.assert_allclose(out[100:], expected[100:], atol=1e-2)
+
+def test_pcm16_conversion():
+    pcm = np.array([0, 16384, -32768, 32767], dtype=np.int16)
+    np.testing.assert_allclose(pcm16_to_f32(pcm), [0.0, 0.5, -1.0, 32767 / 32768])
+
+def test_decoder_defaults_to_zero_copy_16k_float32():
+    audio = sine(SAMPLE_RATE, seconds=0.1)
+    np.testing.assert_array_equal(AudioDecoder().decode(audio.tobytes()), audio)
+
+@pytest.mark.parametrize("encoding, rate", [("f32", 0), ("f32", -16000), ("f32", 999983), ("pcm16", 10_000_000), ("mp3", 16000)])
+def test_decoder_rejects_invalid_formats(encoding, rate):
+    with pytest.raises(ValueError):
+        AudioDecoder(encoding, rate)
@@ -0,0 +1,30 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services.rolling_transcript import MAX_SUMMARY_FAILURES, RollingTranscript
+
+class FailingCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        raise RuntimeError("quota exceeded")
+
+def test_unsummarized_text_is_dropped_after_repeated_failures():
+    completions = FailingCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    async def run():
+        transcript = RollingTranscript(client, max_tokens=5, summarize_every=1)
+        transcript.append(" The meeting starts.")
+        for i in range(MAX_SUMMARY_FAILURES):
+            transcript.append(f" sentence number {i} of the meeting.")
+            await transcript._summarizing
+        return transcript
+
+    transcript = asyncio.run(run())
+
+    assert completions.calls == MAX_SUMMARY_FAILURES
+    assert transcript.evicted == ""
+    assert "sentence number 0" not in transcript.text()
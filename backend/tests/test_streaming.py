@@ -0,0 +1,90 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services import streaming
+from app.services.audio_batcher import SAMPLE_RATE
+from app.services.streaming import LocalAgreementTranscriber
+
+# Word k is spoken from 0.5k to 0.5k + 0.4 seconds
+WORDS = [(0.5 * k, 0.5 * k + 0.4, f" word{k}") for k in range(60)]
+
+class FakeBatcher:
+    """Transcribes windows of a synthetic stream whose samples hold their absolute index.
+
+    Words cut off by the end of the window come back truncated, like Whisper would.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    async def submit(self, audio, initial_prompt=""):
+        self.calls += 1
+        start = audio[0] / SAMPLE_RATE
+        end = (audio[-1] + 1) / SAMPLE_RATE
+        words = []
+        for word_start, word_end, text in WORDS:
+            if word_start < start:
+                continue
+            if word_end <= end:
+                words.append((word_start - start, word_end - start, text))
+            elif word_start < end:
+                words.append((word_start - start, end - start, text[:4]))
+        return words
+
+@pytest.fixture(autouse=True)
+def always_speech(monkeypatch):
+    monkeypatch.setattr(streaming, "has_speech", lambda audio: True)
+
+def stream(frame_size, seconds=30):
+    batcher = FakeBatcher()
+    transcriber = LocalAgreementTranscriber(batcher)
+    audio = np.arange(seconds * SAMPLE_RATE, dtype=np.float32)
+
+    async def run():
+        text = ""
+        for i in range(0, audio.size, frame_size):
+            text += await transcriber.process(audio[i:i + frame_size])
+        return text
+
+    return asyncio.run(run()), batcher, transcriber
+
+@pytest.mark.parametrize("frame_size", [2048, SAMPLE_RATE, 3 * SAMPLE_RATE])
+def test_commits_every_word_in_order_without_partials(frame_size):
+    text, _, _ = stream(frame_size)
+
+    committed = text.split()
+    assert len(committed) >= 50
+    assert committed == [word.strip() for _, _, word in WORDS[:len(committed)]]
+
+def test_small_frames_are_accumulated_before_transcribing():
+    _, batcher, _ = stream(2048, seconds=10)
+
+    # About one pass per second of audio, not one per 128 ms frame
+    assert batcher.calls <= 10
+
+def test_buffer_is_capped_when_windows_never_agree(monkeypatch):
+    class Disagreeing(FakeBatcher):
+        async def submit(self, audio, initial_prompt=""):
+            self.calls += 1
+            return [(0.0, 0.4, f" guess{self.calls}")]
+
+    transcriber = LocalAgreementTranscriber(Disagreeing())
+    audio = np.arange(40 * SAMPLE_RATE, dtype=np.float32)
+
+    async def run():
+        for i in range(0, audio.size, SAMPLE_RATE):
+            await transcriber.process(audio[i:i + SAMPLE_RATE])
+
+    asyncio.run(run())
+    assert transcriber.audio.size <= transcriber.max_buffer * SAMPLE_RATE + 1
+
+def test_finish_returns_unconfirmed_words():
+    text, _, transcriber = stream(SAMPLE_RATE, seconds=10)
+    pending = [word for _, _, word in transcriber.pending]
+
+    assert pending
+    assert transcriber.finish() == "".join(pending)
+    assert transcriber.pending == []
+    assert transcriber.finish() == ""
@@ -0,0 +1,45 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.services import transcription_service
+from app.services.transcription_service import MAX_PATCH_FAILURES, TranscriptionService
+
+class FakeCompletions:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        content = self.replies.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+def make_service(monkeypatch, replies):
+    completions = FakeCompletions(replies)
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    monkeypatch.setattr(transcription_service, "get_whisper", lambda: None)
+    monkeypatch.setattr(transcription_service, "get_openai_client", lambda api_key: client)
+    return TranscriptionService("test-key"), completions
+
+def test_patch_is_requested_as_json_object(monkeypatch):
+    patch = {"patch": [{"op": "add", "path": "/items/-", "value": {"task": "Send the notes"}}]}
+    service, completions = make_service(monkeypatch, [json.dumps(patch)])
+
+    items = asyncio.run(service._extract_action_items("I'll send the notes."))
+
+    assert [item.task for item in items] == ["Send the notes"]
+    assert completions.requests[0]["response_format"] == {"type": "json_object"}
+
+def test_failing_delta_is_dropped_after_repeated_failures(monkeypatch):
+    service, _ = make_service(monkeypatch, ["not json"] * (2 * MAX_PATCH_FAILURES))
+    service.diagram_delta = service.action_delta = "Some new text."
+
+    async def run():
+        for _ in range(MAX_PATCH_FAILURES - 1):
+            await service._analyze_content()
+        assert service.diagram_delta == service.action_delta == "Some new text."
+        await service._analyze_content()
+
+    asyncio.run(run())
+    assert service.diagram_delta == service.action_delta == ""
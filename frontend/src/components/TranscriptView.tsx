@@ -1,6 +1,13 @@
 import React, { useEffect, useState, useRef, useCallback } from 'react';
 import { WebSocketClient } from '../services/WebSocketClient';
 
+interface ActionItem {
+  task: string;
+  assignee?: string | null;
+  due_date?: string | null;
+  context?: string | null;
+}
+
 interface Props {
   transcript: string;
   onUpdate?: (data: any) => void;
@@ -18,8 +25,11 @@ export const TranscriptView: React.FC<Props> = ({ transcript, onUpdate }) => {
   const reconnectAttempts = useRef(0);
   const MAX_RECONNECT_ATTEMPTS = 5;
   const isShuttingDown = useRef(false);
+  // Rate the browser captures at; the backend resamples it to 16 kHz
+  const captureSampleRate = useRef<number | null>(null);
   const [diagram, setDiagram] = useState<string>('');
-  const [actionItems, setActionItems] = useState<string[]>([]);
+  const diagramStreamDone = useRef(true);
+  const [actionItems, setActionItems] = useState<ActionItem[]>([]);
 
   const connectWebSocket = useCallback(() => {
     if (reconnectAttempts.current >= MAX_RECONNECT_ATTEMPTS) {
@@ -27,7 +37,13 @@ export const TranscriptView: React.FC<Props> = ({ transcript, onUpdate }) => {
       return;
     }
 
-    const client = new WebSocketClient('ws://localhost:8000/ws/audio');
+    if (captureSampleRate.current === null) {
+      const probe = new AudioContext();
+      captureSampleRate.current = probe.sampleRate;
+      probe.close();
+    }
+
+    const client = new WebSocketClient(`ws://localhost:8000/ws/audio?sample_rate=${captureSampleRate.current}`);
     
     client.onConnect(() => {
       setIsConnected(true);
@@ -90,7 +106,8 @@ export const TranscriptView: React.FC<Props> = ({ transcript, onUpdate }) => {
         } 
       });
 
-      audioContext.current = new AudioContext();
+      // Capture at the rate announced to the backend when connecting
+      audioContext.current = new AudioContext({ sampleRate: captureSampleRate.current ?? undefined });
       sourceRef.current = audioContext.current.createMediaStreamSource(streamRef.current);
       processorRef.current = audioContext.current.createScriptProcessor(2048, 1, 1);
 
@@ -119,10 +136,19 @@ export const TranscriptView: React.FC<Props> = ({ transcript, onUpdate }) => {
   };
 
   const handleUpdate = (data: any) => {
+    if (data.type === 'diagram_delta') {
+      // The first delta after a finished diagram starts a new one
+      const fresh = diagramStreamDone.current;
+      diagramStreamDone.current = false;
+      setDiagram(prev => (fresh ? '' : prev) + data.data);
+    }
     if (data.type === 'update') {
       if (data.data.transcript) {
         onUpdate?.(data);
       }
+      if ('diagram' in data.data) {
+        diagramStreamDone.current = true;
+      }
       if (data.data.diagram) {
         setDiagram(data.data.diagram);
       }
@@ -208,7 +234,11 @@ export const TranscriptView: React.FC<Props> = ({ transcript, onUpdate }) => {
                       <span className="w-6 h-6 rounded-full bg-blue-100 text-blue-600 flex items-center justify-center">
                         {index + 1}
                       </span>
-                      <span>{item}</span>
+                      <span>
+                        {item.task}
+                        {item.assignee && <span className="text-sm text-gray-500"> ({item.assignee})</span>}
+                        {item.due_date && <span className="text-sm text-gray-500"> due {item.due_date}</span>}
+                      </span>
                     </li>
                   ))}
                 </ul>
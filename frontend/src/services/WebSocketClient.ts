@@ -3,9 +3,11 @@ export class WebSocketClient {
   private messageHandlers: ((data: any) => void)[] = [];
   private connectHandlers: (() => void)[] = [];
   private disconnectHandlers: (() => void)[] = [];
+  private decoder = new TextDecoder();
 
   constructor(url: string) {
     this.ws = new WebSocket(url);
+    this.ws.binaryType = 'arraybuffer';
     
     this.ws.onopen = () => {
       this.connectHandlers.forEach(handler => handler());
@@ -13,7 +15,9 @@ export class WebSocketClient {
 
     this.ws.onmessage = (event) => {
       try {
-        const data = JSON.parse(event.data);
+        // The server sends JSON as binary frames
+        const text = typeof event.data === 'string' ? event.data : this.decoder.decode(event.data);
+        const data = JSON.parse(text);
         this.messageHandlers.forEach(handler => handler(data));
       } catch (error) {
         console.error('Error parsing WebSocket message:', error);